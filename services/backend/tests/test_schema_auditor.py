@@ -0,0 +1,87 @@
+"""
+Test suite for the schema auditor's column comparison.
+Feeds pg_catalog snapshot rows (as returned by SCHEMA_SNAPSHOT_QUERY)
+through _validate_column.
+"""
+
+import pytest
+
+from schema_auditor_agent import ColSpec, SchemaAuditor, SchemaComplianceLevel
+
+
+def snapshot_column(name, udt_name, length=None, nullable=False, default=None):
+    """Build a column row shaped like the snapshot query output."""
+    return {
+        "name": name,
+        "udt_name": udt_name,
+        "character_maximum_length": length,
+        "nullable": nullable,
+        "default": default,
+    }
+
+
+@pytest.fixture
+def auditor():
+    """Auditor that never touches a database."""
+    return SchemaAuditor(database_url="postgresql://test", use_cache=False)
+
+
+class TestValidateColumn:
+    """Test mapping of snapshot rows onto documented column specs."""
+
+    @pytest.mark.parametrize("documented, udt_name, length, actual_type", [
+        ("TIMESTAMP", "timestamptz", None, "TIMESTAMPTZ"),
+        ("TIMESTAMP", "timestamp", None, "TIMESTAMP"),
+        ("UUID", "uuid", None, "UUID"),
+        ("UUID", "bpchar", 36, "BPCHAR(36)"),
+        ("VARCHAR(255)", "varchar", 255, "VARCHAR(255)"),
+        ("TEXT", "text", None, "TEXT"),
+        ("INTEGER", "int4", None, "INT4"),
+        ("INTEGER", "int8", None, "INT8"),
+        ("BOOLEAN", "bool", None, "BOOL"),
+        ("JSON", "jsonb", None, "JSONB"),
+    ])
+    def test_catalog_type_names_are_compliant(self, auditor, documented, udt_name, length, actual_type):
+        """Test that pg_type spellings match their documented SQL types."""
+        validation = auditor._validate_column(
+            "col",
+            ColSpec(type=documented, nullable=False),
+            snapshot_column("col", udt_name, length)
+        )
+
+        assert validation.actual_type == actual_type
+        assert validation.compliance == SchemaComplianceLevel.COMPLIANT
+        assert validation.notes == []
+
+    def test_type_mismatch_is_minor_deviation(self, auditor):
+        """Test that a genuinely different type is still flagged."""
+        validation = auditor._validate_column(
+            "col",
+            ColSpec(type="BOOLEAN", nullable=False),
+            snapshot_column("col", "timestamptz")
+        )
+
+        assert validation.compliance == SchemaComplianceLevel.MINOR_DEVIATION
+
+    def test_nullable_mismatch(self, auditor):
+        """Test that a nullable mismatch is noted."""
+        validation = auditor._validate_column(
+            "created_at",
+            ColSpec(type="TIMESTAMP", nullable=False),
+            snapshot_column("created_at", "timestamptz", nullable=True, default="now()")
+        )
+
+        assert validation.compliance == SchemaComplianceLevel.MINOR_DEVIATION
+        assert validation.has_default is True
+        assert "Nullable mismatch" in validation.notes[0]
+
+    def test_missing_column(self, auditor):
+        """Test that an absent snapshot row is reported as missing."""
+        validation = auditor._validate_column(
+            "col",
+            ColSpec(type="TEXT"),
+            None
+        )
+
+        assert validation.actual_type is None
+        assert validation.compliance == SchemaComplianceLevel.MISSING